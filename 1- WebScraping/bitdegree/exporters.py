@@ -0,0 +1,20 @@
+# Define here your item exporters
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/exporters.html
+
+from scrapy.exporters import JsonItemExporter
+
+from bitdegree.profiling import get_active_profiler
+
+
+class ProfiledJsonItemExporter(JsonItemExporter):
+    # Behaves exactly like JsonItemExporter, but records each exported
+    # item as an 'export' stage while profiling is active.
+
+    def export_item(self, item):
+        profiler = get_active_profiler()
+        if profiler is None:
+            return super().export_item(item)
+        with profiler.stage("export"):
+            return super().export_item(item)
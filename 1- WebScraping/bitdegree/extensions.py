@@ -0,0 +1,54 @@
+# Define here your extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+from bitdegree.profiling import RunProfiler
+
+
+class ProfilingExtension:
+    # Runs the 'scrape' section of the profiling report for the whole
+    # crawl. Callback and export stages are recorded by
+    # ProfilingSpiderMiddleware and ProfiledJsonItemExporter; download
+    # latency is taken from each response and recorded per page as
+    # 'download: <callback>', as downloads overlap and have no CPU time or
+    # allocations of their own to attribute.
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("PROFILING_ENABLED"):
+            raise NotConfigured
+
+        profiler = RunProfiler(
+            "scrape",
+            settings.get("PROFILING_REPORT", "profile_report.json"),
+            trace_memory=settings.getbool("PROFILING_TRACEMALLOC", True),
+            cprofile=settings.getbool("PROFILING_CPROFILE"),
+        )
+        ext = cls(profiler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        # The feed exporter is connected to spider_closed before this
+        # extension, so the feed is already finished when the report is written.
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.profiler.start()
+
+    def response_received(self, response, request, spider):
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            callback = request.callback or spider.parse
+            self.profiler.record("download: %s" % callback.__name__, latency)
+
+    def spider_closed(self, spider, reason):
+        self.profiler.write()
+        spider.logger.info("Profiling report written to %s" % self.profiler.report_path)
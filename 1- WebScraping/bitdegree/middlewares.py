@@ -4,10 +4,13 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from bitdegree.profiling import get_active_profiler
+
 
 class BitdegreeSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +104,45 @@ class BitdegreeDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ProfilingSpiderMiddleware:
+    # Times each spider callback as a 'parse: <callback>' stage of the
+    # active profiler. Only enabled when PROFILING_ENABLED is set.
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("PROFILING_ENABLED"):
+            raise NotConfigured
+        return cls()
+
+    def process_spider_output(self, response, result, spider):
+        # Callbacks are generators, so their work happens while the output
+        # is consumed. It is drained inside the stage to keep the engine's
+        # own processing of the yielded items out of the measurement.
+        profiler = get_active_profiler()
+        if profiler is None:
+            yield from result
+            return
+
+        with profiler.stage(self._stage_name(response, spider)):
+            output = list(result)
+        yield from output
+
+    async def process_spider_output_async(self, response, result, spider):
+        # Used instead of process_spider_output when Scrapy passes the
+        # callback output as an asynchronous iterable.
+        profiler = get_active_profiler()
+        if profiler is None:
+            async for obj in result:
+                yield obj
+            return
+
+        with profiler.stage(self._stage_name(response, spider)):
+            output = [obj async for obj in result]
+        for obj in output:
+            yield obj
+
+    def _stage_name(self, response, spider):
+        callback = response.request.callback or spider.parse
+        return "parse: %s" % callback.__name__
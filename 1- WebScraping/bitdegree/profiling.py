@@ -0,0 +1,305 @@
+"""
+This module provides an opt-in profiler shared by the Scrapy spider and the DataProcessing notebook.
+It records per-stage wall time, CPU time and allocation peaks (tracemalloc), can optionally capture a
+cProfile dump, and merges everything into a single JSON run report so two runs can be compared side by side.
+
+It only depends on the standard library, so the notebook can import it without Scrapy being installed.
+"""
+
+import cProfile
+import gc
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+_active_profiler = None
+
+
+def get_active_profiler():
+    """
+    Returns the profiler of the run in progress.
+
+    Returns:
+        The started RunProfiler, or None when profiling is disabled.
+    """
+
+    return _active_profiler
+
+
+class RunProfiler:
+    """
+    Collects per-stage measurements for one component of the pipeline and writes them to a run report.
+
+    Stages with the same name are aggregated, so a callback that runs once per page reports its total,
+    its number of calls and its slowest call. Stages may be nested; the allocation peak of an inner stage
+    is also counted towards the peak of the stage enclosing it.
+
+    Attributes:
+        component (str): Section of the report this profiler writes to (e.g. 'scrape' or 'analysis').
+        report_path (str): Path of the JSON run report shared by all components.
+        trace_memory (bool): Whether allocation peaks are recorded with tracemalloc.
+        cprofile (bool): Whether a cProfile dump is written next to the report.
+    """
+
+    def __init__(self, component, report_path, trace_memory=True, cprofile=False):
+        self.component = component
+        self.report_path = report_path
+        self.trace_memory = trace_memory
+        self.cprofile = cprofile
+        self.stages = {}
+        self._peaks = [0]
+        self._profile = None
+        self._started_at = None
+        self._wall_start = None
+        self._cpu_start = None
+        self._owns_tracemalloc = False
+        self._on_write = []
+        self._running = False
+        self._open_stages = 0
+
+    def start(self):
+        """
+        Starts the run clock, tracemalloc and cProfile, and makes this profiler the active one.
+
+        A profiler that is still active (e.g. from an earlier run of the same notebook cell) is discarded
+        first, so it releases tracemalloc and its hooks instead of measuring alongside this run.
+
+        Raises:
+            RuntimeError: If this profiler is already running or has a stage open.
+        """
+
+        global _active_profiler
+
+        if self._running or self._open_stages:
+            raise RuntimeError('Profiler for {!r} is already running'.format(self.component))
+        if _active_profiler is not None:
+            _active_profiler.discard()
+
+        # Collect leftovers from earlier work so they do not inflate this run's numbers.
+        gc.collect()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        elif self.trace_memory:
+            # Do not report allocations made before this run as its peak.
+            tracemalloc.reset_peak()
+        self._peaks = [0]
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+        self._started_at = datetime.now(timezone.utc)
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._running = True
+        _active_profiler = self
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures the code run inside the `with` block as one call of the given stage.
+
+        Args:
+            name (str): Name of the stage in the report.
+        """
+
+        traced = self.trace_memory and tracemalloc.is_tracing()
+        if traced:
+            start_current, peak_so_far = tracemalloc.get_traced_memory()
+            self._carry_peak(peak_so_far)
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+
+        self._open_stages += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self._open_stages -= 1
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = None
+            if traced:
+                stage_peak = max(tracemalloc.get_traced_memory()[1], self._peaks.pop())
+                self._carry_peak(stage_peak)
+                peak = max(stage_peak - start_current, 0)
+            self.record(name, wall, cpu, peak)
+
+    def _carry_peak(self, peak):
+        # reset_peak() discards the enclosing stage's peak, so it is carried on a stack instead.
+        self._peaks[-1] = max(self._peaks[-1], peak)
+
+    def record(self, name, wall, cpu=None, peak=None):
+        """
+        Adds one measured call to a stage.
+
+        Args:
+            name (str): Name of the stage in the report.
+            wall (float): Wall time of the call in seconds.
+            cpu (float): CPU time of the call in seconds, or None when it cannot be attributed.
+            peak (int): Allocation peak of the call in bytes, or None when it was not traced.
+        """
+
+        stats = self.stages.setdefault(name, {
+            'calls': 0,
+            'wall_s': 0.0,
+            'wall_max_s': 0.0,
+            'cpu_s': None,
+            'peak_alloc_kib': None,
+        })
+        stats['calls'] += 1
+        stats['wall_s'] += wall
+        stats['wall_max_s'] = max(stats['wall_max_s'], wall)
+        if cpu is not None:
+            stats['cpu_s'] = (stats['cpu_s'] or 0.0) + cpu
+        if peak is not None:
+            stats['peak_alloc_kib'] = max(stats['peak_alloc_kib'] or 0.0, peak / 1024)
+
+    def write(self):
+        """
+        Stops profiling and merges this component's section into the run report.
+
+        Returns:
+            The section written to the report.
+
+        Raises:
+            RuntimeError: If the profiler is not running or a stage is still open.
+        """
+
+        if not self._running:
+            raise RuntimeError('Profiler for {!r} is not running'.format(self.component))
+
+        # Detach hooks first so a stage still open in the caller is closed and included in the report.
+        self._detach()
+        if self._open_stages:
+            raise RuntimeError('Cannot write the {!r} report while a stage is still open'.format(self.component))
+
+        wall = time.perf_counter() - self._wall_start
+        cpu = time.process_time() - self._cpu_start
+        peak = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], self._peaks[0]) / 1024
+
+        profile_path = None
+        if self._profile is not None:
+            self._profile.disable()
+            profile_path = '{}.{}.prof'.format(os.path.splitext(self.report_path)[0], self.component)
+            self._profile.dump_stats(profile_path)
+        self._release()
+
+        section = {
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'tracemalloc': self.trace_memory,
+            'cprofile_output': profile_path,
+            'total': {
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'peak_alloc_kib': round(peak, 1) if peak is not None else None,
+            },
+            'stages': {name: _rounded(stats) for name, stats in sorted(self.stages.items())},
+        }
+
+        report = {}
+        if os.path.exists(self.report_path):
+            try:
+                with open(self.report_path) as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                report = {}
+        report[self.component] = section
+        with open(self.report_path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+        return section
+
+    def discard(self):
+        """
+        Stops profiling without writing the report, releasing tracemalloc, cProfile and any hooks.
+        """
+
+        if self._running:
+            self._detach()
+            self._release()
+
+    def _detach(self):
+        while self._on_write:
+            self._on_write.pop()()
+
+    def _release(self):
+        global _active_profiler
+
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile = None
+        self._running = False
+        if _active_profiler is self:
+            _active_profiler = None
+
+
+def profile_notebook_cells(profiler, shell=None):
+    """
+    Records every subsequently executed notebook cell as a stage of the given profiler.
+
+    A cell's stage is named after its first line (with a leading '#' stripped) followed by a short hash of
+    its source, so cells that share a comment still get distinct and run-to-run stable names. The hooks are
+    removed when the profiler is written or discarded, and calling this again replaces the hooks of any
+    earlier profiler, so re-running the profiling cell in the same kernel measures each run the same way.
+
+    Args:
+        profiler (RunProfiler): The started profiler to record into.
+        shell: The IPython shell to hook into; defaults to the current one.
+    """
+
+    if shell is None:
+        from IPython import get_ipython
+        shell = get_ipython()
+
+    previous_unhook = getattr(shell, '_bitdegree_unhook_cells', None)
+    if previous_unhook is not None:
+        previous_unhook()
+
+    running = {}
+
+    def pre_run_cell(info):
+        source = info.raw_cell.strip()
+        label = source.splitlines()[0].lstrip('#').strip() if source else 'empty cell'
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:6]
+        context = profiler.stage('cell: {} ({})'.format(label[:60], digest))
+        context.__enter__()
+        running['context'] = context
+
+    def post_run_cell(result):
+        context = running.pop('context', None)
+        if context is not None:
+            context.__exit__(None, None, None)
+
+    def unhook():
+        # Close the stage of the cell currently running, as its post_run_cell will no longer fire.
+        post_run_cell(None)
+        shell.events.unregister('pre_run_cell', pre_run_cell)
+        shell.events.unregister('post_run_cell', post_run_cell)
+        if getattr(shell, '_bitdegree_unhook_cells', None) is unhook:
+            shell._bitdegree_unhook_cells = None
+        if unhook in profiler._on_write:
+            profiler._on_write.remove(unhook)
+
+    shell.events.register('pre_run_cell', pre_run_cell)
+    shell.events.register('post_run_cell', post_run_cell)
+    shell._bitdegree_unhook_cells = unhook
+    profiler._on_write.append(unhook)
+
+
+def _rounded(stats):
+    return {key: round(value, 6) if isinstance(value, float) else value for key, value in stats.items()}
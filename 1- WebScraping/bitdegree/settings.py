@@ -7,6 +7,8 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+from pathlib import Path
+
 BOT_NAME = "bitdegree"
 
 SPIDER_MODULES = ["bitdegree.spiders"]
@@ -47,6 +49,9 @@ ROBOTSTXT_OBEY = True
 #SPIDER_MIDDLEWARES = {
 #    "bitdegree.middlewares.BitdegreeSpiderMiddleware": 543,
 #}
+SPIDER_MIDDLEWARES = {
+    "bitdegree.middlewares.ProfilingSpiderMiddleware": 1000,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
@@ -59,6 +64,9 @@ ROBOTSTXT_OBEY = True
 #EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
 #}
+EXTENSIONS = {
+    "bitdegree.extensions.ProfilingExtension": 500,
+}
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -87,6 +95,18 @@ ROBOTSTXT_OBEY = True
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
+# Profiling (disabled by default). Enable with
+#   scrapy crawl data_scraper -O data.json -s PROFILING_ENABLED=True
+# to write per-stage wall time, CPU time and allocation peaks to the run
+# report shared with DataProcessing.ipynb at the repository root.
+PROFILING_ENABLED = False
+PROFILING_REPORT = str(Path(__file__).resolve().parents[2] / "profile_report.json")
+PROFILING_TRACEMALLOC = True
+PROFILING_CPROFILE = False
+FEED_EXPORTERS = {
+    "json": "bitdegree.exporters.ProfiledJsonItemExporter",
+}
+
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"